@@ -5,22 +5,47 @@ This is the SINGLE entry point to MongoDB. Both the dashboard frontend
 and the SDK communicate with the database exclusively through this API.
 """
 
-import hashlib
+import functools
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+import anyio.to_thread
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 import mongo as mdb
 
 # -- App Setup ----------------------------------------------------------------
 
+# Handlers are sync pymongo code, so FastAPI runs each request on an AnyIO
+# worker thread. The default limit (40) caps concurrent requests well below
+# the MongoClient pool size; match the two instead.
+THREADPOOL_SIZE = int(os.getenv("AEGIS_THREADPOOL_SIZE", "100"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    yield
+
+
 app = FastAPI(
     title="Sentinel Guardrails API",
     description="Dashboard backend + SDK gateway for monitoring agentic AI policies.",
     version="0.4.0",
+    lifespan=lifespan,
+    # List endpoints return ORJSONResponse of plain dicts built from our own
+    # DB rows, skipping Pydantic validation; response_model documents shape.
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -35,6 +60,143 @@ from demo_router import demo_router
 app.include_router(demo_router, prefix="/demo")
 
 
+# -- Helpers ------------------------------------------------------------------
+
+# Audit-log status → dashboard severity badge.
+SEVERITY_MAP = {
+    "ALLOWED": "success",
+    "BLOCKED": "failure",
+    "KILLED": "critical",
+    "PENDING": "warning",
+    "APPROVED": "success",
+    "DENIED": "failure",
+    "TIMEOUT": "failure",
+}
+
+# The same mapping as a server-side expression, so MongoDB derives severity
+# while it projects the rows and the handlers pass documents straight through.
+SEVERITY_SWITCH = {
+    "$switch": {
+        "branches": [
+            {"case": {"$eq": ["$status", status]}, "then": severity}
+            for status, severity in SEVERITY_MAP.items()
+        ],
+        "default": "info",
+    }
+}
+
+
+def _log_stages(limit: int = 50) -> list:
+    """Pipeline stages: newest *limit* audit_log rows shaped as LogEntry dicts."""
+    return [
+        {"$sort": {"id": -1}},
+        {"$limit": limit},
+        {"$project": {
+            "_id": 0,
+            "id": 1,
+            "timestamp": {"$cond": [
+                {"$eq": [{"$type": "$timestamp"}, "date"]},
+                {"$dateToString": {"format": mdb.TIMESTAMP_FORMAT, "date": "$timestamp"}},
+                "$timestamp",  # legacy string timestamps pass through
+            ]},
+            "agent_name": 1,
+            "action": 1,
+            "status": 1,
+            "severity": SEVERITY_SWITCH,
+            "details": {"$ifNull": ["$details", ""]},
+        }},
+    ]
+
+
+def _recent_logs(db, match: dict, limit: int = 50):
+    """Cursor over the newest *limit* audit_log rows matching *match* as LogEntry dicts."""
+    return db.audit_log.aggregate([{"$match": match}, *_log_stages(limit)])
+
+
+# Runs independent MongoDB queries of one request concurrently. pymongo
+# releases the GIL while waiting on the network. Sized like the request
+# threadpool so each concurrent request can offload its query without
+# queueing behind the others; threads are only started as needed.
+_QUERY_POOL = ThreadPoolExecutor(max_workers=THREADPOOL_SIZE, thread_name_prefix="aegis-query")
+
+
+# Fallback for agents registered before agent_id was stored on the document.
+_agent_id = lru_cache(maxsize=4096)(mdb.agent_id_for)
+
+
+# -- Response cache -----------------------------------------------------------
+# The dashboard polls every read endpoint every few seconds. Results are
+# cached per (path, session, params) for CACHE_TTL seconds. Every cached
+# endpoint takes mdb.get_data_version() as a parameter, so writes from any
+# instance (and /demo/seed) retire entries at once; local writes also bump
+# _cache_generation. Set AEGIS_CACHE_TTL=0 to disable. Expired and superseded entries
+# are swept whenever the cache grows past CACHE_MAX_ENTRIES.
+
+CACHE_TTL = float(os.getenv("AEGIS_CACHE_TTL", "30"))
+CACHE_MAX_ENTRIES = 1024
+
+_response_cache: dict = {}
+_cache_generation = 0
+
+
+def _evict_stale(now: float) -> None:
+    """Drop entries that are expired or from an older generation."""
+    generation = _cache_generation
+    for key, (gen, expires, _) in list(_response_cache.items()):
+        if gen != generation or expires <= now:
+            _response_cache.pop(key, None)
+    # Every entry still live (e.g. many sessions or versions): start over.
+    if len(_response_cache) > CACHE_MAX_ENTRIES:
+        _response_cache.clear()
+
+
+def cached(prefix: str):
+    """Cache an endpoint's return value under *prefix* for CACHE_TTL seconds."""
+
+    def decorator(fn):
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if CACHE_TTL <= 0:
+                return fn(*args, **kwargs)
+            key = (prefix, mdb.get_current_session_id(), args, tuple(sorted(kwargs.items())))
+            # Read the generation before querying: if a write lands while
+            # we compute, the entry is stored already-stale and never served.
+            generation = _cache_generation
+            now = time.monotonic()
+            hit = _response_cache.get(key)
+            if hit and hit[0] == generation and hit[1] > now:
+                return hit[2]
+            value = fn(*args, **kwargs)
+            if len(_response_cache) >= CACHE_MAX_ENTRIES:
+                _evict_stale(now)
+            _response_cache[key] = (generation, now + CACHE_TTL, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_cache() -> None:
+    """Retire every cached response. O(1), safe to call on each SDK write."""
+    global _cache_generation
+    _cache_generation += 1
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 if the client already holds *etag*; else tag *response*.
+
+    ``no-cache`` makes browsers revalidate every poll, so unchanged data
+    costs one conditional request and no body.
+    """
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return None
+
+
 # -- Pydantic Models (Dashboard) ----------------------------------------------
 
 class StatsResponse(BaseModel):
@@ -109,11 +271,21 @@ class SDKRegisterPolicyRequest(BaseModel):
     rule_type: str
 
 
+class SDKRegisterPoliciesRequest(BaseModel):
+    agent_name: str
+    policies: dict[str, str]
+
+
 class SDKLogEventRequest(BaseModel):
     agent_name: str
     action: str
     status: str
     details: str = ""
+    approval_id: Optional[int] = None
+
+
+class SDKLogEventsRequest(BaseModel):
+    entries: list[SDKLogEventRequest]
 
 
 class SDKCreateApprovalRequest(BaseModel):
@@ -136,23 +308,51 @@ class SDKUpdateStatusRequest(BaseModel):
 # ==============================================================================
 
 @app.get("/stats", response_model=StatsResponse)
-def get_stats():
+def get_stats(request: Request, response: Response):
     """Dashboard header stats — scoped to the current session."""
+    # The 24h block window slides without any write, so the tag also
+    # rolls over every minute.
+    version = f"{mdb.get_data_version()}-{int(time.time() // 60)}"
+    return not_modified(request, response, f'W/"{version}"') or _compute_stats(version)
+
+
+@cached("/stats")
+def _compute_stats(version: str) -> StatsResponse:
+    # *version* is only a cache key: a cached body is served solely under
+    # the ETag it was computed for, never restamped with a newer one.
     db = mdb.get_db()
     sid = mdb.get_current_session_id()
     sf = {"session_id": sid} if sid else {"session_id": None}
 
-    registered = db.agents.count_documents(sf)
-    active = db.agents.count_documents({**sf, "status": "ACTIVE"})
-
-    cutoff = (datetime.utcnow() - timedelta(hours=24)).strftime("%Y-%m-%d %H:%M:%S")
-    blocks_24h = db.audit_log.count_documents({
-        **sf,
-        "status": "BLOCKED",
-        "timestamp": {"$gte": cutoff},
-    })
-
-    pending = db.pending_approvals.count_documents({**sf, "status": "PENDING"})
+    cutoff = datetime.utcnow() - timedelta(hours=24)
+
+    # Agent counts, the 24h block count and the pending-approval count in one
+    # round trip. $facet always emits exactly one document, so each
+    # uncorrelated $lookup runs once even when the session has no agents.
+    counts = next(db.agents.aggregate([
+        {"$match": sf},
+        {"$facet": {
+            "registered": [{"$count": "n"}],
+            "active": [{"$match": {"status": "ACTIVE"}}, {"$count": "n"}],
+        }},
+        {"$lookup": {
+            "from": "audit_log",
+            "pipeline": [
+                {"$match": {**sf, "status": "BLOCKED", "timestamp": {"$gte": cutoff}}},
+                {"$count": "n"},
+            ],
+            "as": "blocks_24h",
+        }},
+        {"$lookup": {
+            "from": "pending_approvals",
+            "pipeline": [{"$match": {**sf, "status": "PENDING"}}, {"$count": "n"}],
+            "as": "pending",
+        }},
+    ]))
+    registered, active, blocks_24h, pending = (
+        counts[k][0]["n"] if counts[k] else 0
+        for k in ("registered", "active", "blocks_24h", "pending")
+    )
 
     if blocks_24h == 0:
         risk_level = "LOW"
@@ -173,30 +373,54 @@ def get_stats():
 
 
 @app.get("/agents", response_model=list[AgentResponse])
-def get_agents():
+def get_agents(request: Request, response: Response):
     """List all agents with calculated risk scores — scoped to current session."""
+    version = mdb.get_data_version()
+    return not_modified(request, response, f'W/"{version}"') or _compute_agents(version)
+
+
+@cached("/agents")
+def _compute_agents(version: str) -> list[AgentResponse]:
+    # *version* keys the cache so the body always matches its ETag.
     db = mdb.get_db()
     sid = mdb.get_current_session_id()
     sf = {"session_id": sid} if sid else {"session_id": None}
 
-    agents = db.agents.find(sf)
+    # The agents fetch and the audit_log $group are independent; run the
+    # first on a helper thread so the two round trips overlap.
+    agents_future = _QUERY_POOL.submit(lambda: list(db.agents.find(
+        sf, {"_id": 0, "agent_id": 1, "name": 1, "status": 1, "owner": 1, "created_at": 1}
+    )))
+
+    # One $group over audit_log instead of three count_documents per agent.
+    counts = defaultdict(lambda: {"total": 0, "BLOCKED": 0, "ALLOWED": 0})
+    for row in db.audit_log.aggregate([
+        {"$match": sf},
+        {"$group": {
+            "_id": {"agent_name": "$agent_name", "status": "$status"},
+            "n": {"$sum": 1},
+        }},
+    ]):
+        c = counts[row["_id"]["agent_name"]]
+        c["total"] += row["n"]
+        if row["_id"]["status"] in ("BLOCKED", "ALLOWED"):
+            c[row["_id"]["status"]] = row["n"]
 
     result = []
-    for agent in agents:
+    for agent in agents_future.result():
         name = agent["name"]
-        log_filter = {**sf, "agent_name": name}
-        total = db.audit_log.count_documents(log_filter)
-        blocked = db.audit_log.count_documents({**log_filter, "status": "BLOCKED"})
-        allowed = db.audit_log.count_documents({**log_filter, "status": "ALLOWED"})
+        c = counts[name]
+        total = c["total"]
+        blocked = c["BLOCKED"]
+        allowed = c["ALLOWED"]
         risk_score = round((blocked / total) * 100, 1) if total > 0 else 0.0
-        agent_id = "AGT-" + hashlib.sha256(name.encode()).hexdigest()[:8]
 
         result.append(AgentResponse(
-            id=agent_id,
+            id=agent.get("agent_id") or _agent_id(name),
             name=name,
             status=agent["status"],
             owner=agent["owner"] or "",
-            created_at=agent.get("created_at", ""),
+            created_at=mdb.format_timestamp(agent.get("created_at")) or "",
             risk_score=risk_score,
             framework="Custom Python",
             total_logs=total,
@@ -210,71 +434,75 @@ def get_agents():
 @app.get("/agents/{name}/logs", response_model=list[LogEntry])
 def get_agent_logs(name: str):
     """Return the last 50 audit log entries for a specific agent — current session."""
-    severity_map = {
-        "ALLOWED": "success",
-        "BLOCKED": "failure",
-        "KILLED": "critical",
-        "PENDING": "warning",
-        "APPROVED": "success",
-        "DENIED": "failure",
-        "TIMEOUT": "failure",
-    }
+    return _compute_agent_logs(name, mdb.get_data_version())
 
+
+@cached("/agents/logs")
+def _compute_agent_logs(name: str, version: str):
+    # *version* keys the cache, so other instances' writes show up at once.
     db = mdb.get_db()
     sid = mdb.get_current_session_id()
     sf = {"session_id": sid} if sid else {"session_id": None}
 
-    agent = db.agents.find_one({"name": name, **sf})
-    if not agent:
+    # Existence check and log fetch in one round trip: the agent document
+    # only matches if it is in this session, and carries its logs with it.
+    agent = next(db.agents.aggregate([
+        {"$match": {"name": name, **sf}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "audit_log",
+            "localField": "name",
+            "foreignField": "agent_name",
+            "pipeline": [{"$match": sf}, *_log_stages()],
+            "as": "logs",
+        }},
+        {"$project": {"_id": 0, "logs": 1}},
+    ]), None)
+    if agent is None:
         raise HTTPException(status_code=404, detail=f"Agent '{name}' not found.")
 
-    cursor = db.audit_log.find({**sf, "agent_name": name}).sort("id", -1).limit(50)
-
-    return [
-        LogEntry(
-            id=doc["id"],
-            timestamp=doc["timestamp"],
-            agent_name=doc["agent_name"],
-            action=doc["action"],
-            status=doc["status"],
-            severity=severity_map.get(doc["status"], "info"),
-            details=doc.get("details", ""),
-        )
-        for doc in cursor
-    ]
+    return ORJSONResponse(agent["logs"])
 
 
 @app.get("/logs", response_model=list[LogEntry])
 def get_global_logs():
     """Return the last 50 audit log entries across ALL agents — current session."""
-    severity_map = {
-        "ALLOWED": "success",
-        "BLOCKED": "failure",
-        "KILLED": "critical",
-        "PENDING": "warning",
-        "APPROVED": "success",
-        "DENIED": "failure",
-        "TIMEOUT": "failure",
-    }
+    return _compute_global_logs(mdb.get_data_version())
+
 
+@cached("/logs")
+def _compute_global_logs(version: str):
+    # *version* keys the cache, so other instances' writes show up at once.
     db = mdb.get_db()
     sid = mdb.get_current_session_id()
     sf = {"session_id": sid} if sid else {"session_id": None}
 
-    cursor = db.audit_log.find(sf).sort("id", -1).limit(50)
+    return ORJSONResponse(list(_recent_logs(db, sf)))
 
-    return [
-        LogEntry(
-            id=doc["id"],
-            timestamp=doc["timestamp"],
-            agent_name=doc["agent_name"],
-            action=doc["action"],
-            status=doc["status"],
-            severity=severity_map.get(doc["status"], "info"),
-            details=doc.get("details", ""),
-        )
-        for doc in cursor
-    ]
+
+# Upper bound on /logs/stream rows; keeps one request from walking the log.
+STREAM_LOGS_MAX = 1000
+
+
+@app.get("/logs/stream")
+def stream_global_logs(limit: int = Query(50, ge=1, le=STREAM_LOGS_MAX)):
+    """Stream the newest audit log entries as NDJSON, one LogEntry per line.
+
+    Rows are written as the cursor yields them, so clients can render
+    before the whole result is serialized and memory stays O(1) in *limit*.
+    """
+    db = mdb.get_db()
+    sid = mdb.get_current_session_id()
+    sf = {"session_id": sid} if sid else {"session_id": None}
+
+    def ndjson(cursor):
+        for doc in cursor:
+            yield orjson.dumps(doc) + b"\n"
+
+    return StreamingResponse(
+        ndjson(_recent_logs(db, sf, limit)),
+        media_type="application/x-ndjson",
+    )
 
 
 @app.post("/agents/{name}/toggle")
@@ -283,23 +511,17 @@ def toggle_agent(name: str, body: ToggleRequest):
     if body.status not in ("ACTIVE", "PAUSED"):
         raise HTTPException(status_code=400, detail="Status must be ACTIVE or PAUSED")
 
-    # Verify agent belongs to current session
+    # Only agents in the current session can be toggled
     sid = mdb.get_current_session_id()
-    if sid:
-        db = mdb.get_db()
-        agent = db.agents.find_one({"name": name, "session_id": sid})
-        if not agent:
-            raise HTTPException(status_code=404, detail=f"Agent '{name}' not found in current session.")
+    if not mdb.update_status(name, body.status, session_id=sid):
+        raise HTTPException(status_code=404, detail=f"Agent '{name}' not found in current session.")
 
-    mdb.update_status(name, body.status)
+    invalidate_cache()
     return {"status": "updated", "new_status": body.status}
 
 
-@app.get("/agents/{name}/policies", response_model=PoliciesResponse)
-def get_policies(name: str):
-    """Get all allow/block/review rules for an agent."""
-    policies = mdb.get_all_policies(name)
-
+def _group_policies(policies) -> PoliciesResponse:
+    """Split policy rows into sorted allowed/blocked/review action lists."""
     allowed = []
     blocked = []
     review = []
@@ -319,36 +541,61 @@ def get_policies(name: str):
     )
 
 
+@app.get("/agents/{name}/policies", response_model=PoliciesResponse)
+def get_policies(name: str):
+    """Get all allow/block/review rules for an agent."""
+    return _group_policies(mdb.get_all_policies(name))
+
+
+@app.get("/policies", response_model=dict[str, PoliciesResponse])
+def get_all_policies(agents: Optional[str] = None):
+    """Get rules for many agents in one query, keyed by agent name.
+
+    ``agents`` is a comma-separated list of names; omit it for every agent.
+    """
+    names = [a for a in agents.split(",") if a] if agents else None
+
+    # Requested agents without policy rows still get (empty) entries,
+    # matching /agents/{name}/policies.
+    by_agent = defaultdict(list, {name: [] for name in names or ()})
+    for p in mdb.get_policies_for_agents(names):
+        by_agent[p["agent_name"]].append(p)
+
+    return {name: _group_policies(rows) for name, rows in by_agent.items()}
+
+
 @app.get("/approvals/pending", response_model=list[PendingApproval])
 def get_pending():
     """List pending human approval requests."""
     rows = mdb.get_pending_approvals()
 
-    return [
-        PendingApproval(
-            id=row["id"],
-            agent_name=row["agent_name"],
-            action=row["action"],
-            args_json=row["args_json"] or "{}",
-            status=row["status"],
-            created_at=row["created_at"],
-        )
+    return ORJSONResponse([
+        {
+            "id": row["id"],
+            "agent_name": row["agent_name"],
+            "action": row["action"],
+            "args_json": row["args_json"] or "{}",
+            "status": row["status"],
+            "created_at": row["created_at"],
+        }
         for row in rows
-    ]
+    ])
 
 
 @app.post("/approvals/{approval_id}/decide")
 def api_decide_approval(approval_id: int, body: DecisionRequest):
     """Approve or Deny a request."""
-    current = mdb.get_approval_status(approval_id)
-    if not current:
-        raise HTTPException(status_code=404, detail="Approval request not found")
-    if current != "PENDING":
-        raise HTTPException(status_code=400, detail=f"Request is already {current}")
     if body.decision not in ("APPROVED", "DENIED"):
         raise HTTPException(status_code=400, detail="Decision must be APPROVED or DENIED")
 
-    mdb.decide_approval(approval_id, body.decision)
+    if not mdb.decide_approval(approval_id, body.decision):
+        # Only the failure path pays a second read, to say why.
+        current = mdb.get_approval_status(approval_id)
+        if not current:
+            raise HTTPException(status_code=404, detail="Approval request not found")
+        raise HTTPException(status_code=400, detail=f"Request is already {current}")
+
+    invalidate_cache()
     return {"status": "success", "decision": body.decision}
 
 
@@ -360,6 +607,7 @@ def api_decide_approval(approval_id: int, body: DecisionRequest):
 def sdk_init():
     """Initialize database indexes. Called once on SDK startup."""
     mdb.init_db()
+    invalidate_cache()
     return {"status": "ok"}
 
 
@@ -367,6 +615,7 @@ def sdk_init():
 def sdk_register_agent(body: SDKRegisterAgentRequest):
     """Register or update an agent."""
     mdb.upsert_agent(body.name, body.owner)
+    invalidate_cache()
     return {"status": "ok"}
 
 
@@ -377,6 +626,13 @@ def sdk_register_policy(body: SDKRegisterPolicyRequest):
     return {"status": "ok"}
 
 
+@app.post("/sdk/register-policies")
+def sdk_register_policies(body: SDKRegisterPoliciesRequest):
+    """Register or update all of an agent's policy rules in one call."""
+    mdb.upsert_policies(body.agent_name, body.policies)
+    return {"status": "ok"}
+
+
 @app.get("/sdk/agent-status/{name}")
 def sdk_agent_status(name: str):
     """Get the current status of an agent (ACTIVE / PAUSED)."""
@@ -391,10 +647,28 @@ def sdk_get_policy(agent_name: str, action: str):
     return {"rule_type": rule}
 
 
+@app.get("/sdk/check/{agent_name}/{action}")
+def sdk_check_action(agent_name: str, action: str):
+    """Get the agent status and the action's rule_type in one call."""
+    return {
+        "status": mdb.get_agent_status(agent_name),
+        "rule_type": mdb.get_policy(agent_name, action),
+    }
+
+
 @app.post("/sdk/log")
 def sdk_log_event(body: SDKLogEventRequest):
     """Write an audit log entry."""
-    mdb.log_event(body.agent_name, body.action, body.status, body.details)
+    mdb.log_event(body.agent_name, body.action, body.status, body.details, body.approval_id)
+    invalidate_cache()
+    return {"status": "ok"}
+
+
+@app.post("/sdk/log-batch")
+def sdk_log_events(body: SDKLogEventsRequest):
+    """Write several audit log entries in one call."""
+    mdb.log_events([e.model_dump() for e in body.entries])
+    invalidate_cache()
     return {"status": "ok"}
 
 
@@ -402,6 +676,7 @@ def sdk_log_event(body: SDKLogEventRequest):
 def sdk_update_status(body: SDKUpdateStatusRequest):
     """Update agent status (kill-switch)."""
     mdb.update_status(body.name, body.status)
+    invalidate_cache()
     return {"status": "ok"}
 
 
@@ -409,6 +684,7 @@ def sdk_update_status(body: SDKUpdateStatusRequest):
 def sdk_create_approval(body: SDKCreateApprovalRequest):
     """Create a pending approval request. Returns the approval ID."""
     approval_id = mdb.create_approval(body.agent_name, body.action, body.args_json)
+    invalidate_cache()
     return {"approval_id": approval_id}
 
 
@@ -423,6 +699,7 @@ def sdk_approval_status(approval_id: int):
 def sdk_decide_approval(approval_id: int, body: SDKDecideApprovalRequest):
     """Decide on an approval request."""
     mdb.decide_approval(approval_id, body.decision)
+    invalidate_cache()
     return {"status": "ok"}
 
 
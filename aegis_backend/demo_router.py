@@ -6,10 +6,12 @@ banking data (customers, accounts, transactions) for the demo agents.
 """
 
 import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter
 from pydantic import BaseModel
+from pymongo import WriteConcern
 
 import mongo as mdb
 
@@ -30,6 +32,20 @@ CUSTOMERS = [
     ("James Wilson", "012-34-5678", "4716-6789-0123-4567", "555-0110", "james.w@email.com", "468 Poplar Ave, Nashville, TN", "1993-02-28"),
 ]
 
+CUSTOMER_DOCS = [
+    {
+        "id": cust_id,
+        "name": name,
+        "ssn": ssn,
+        "credit_card_number": cc,
+        "phone": phone,
+        "email": email,
+        "address": addr,
+        "dob": dob,
+    }
+    for cust_id, (name, ssn, cc, phone, email, addr, dob) in enumerate(CUSTOMERS, 1)
+]
+
 ACCOUNT_TYPES = ["checking", "savings"]
 TX_DESCRIPTIONS_DEBIT = [
     "Grocery Store", "Gas Station", "Electric Bill", "Online Shopping",
@@ -42,6 +58,27 @@ TX_DESCRIPTIONS_CREDIT = [
 ]
 
 
+# Sentinel + banking collections that /seed drops before re-seeding.
+SEED_DROP_COLLECTIONS = [
+    "agents", "policies", "audit_log", "pending_approvals", "counters",
+    "customers", "accounts", "transactions",
+]
+
+# Indexes for the demo tools' lookups: customers and accounts by id,
+# accounts by customer, and each account's newest transactions.
+SEED_INDEXES = {
+    "customers": [([("id", 1)], {"unique": True})],
+    "accounts": [([("id", 1)], {"unique": True}), ([("customer_id", 1)], {})],
+    # scan_transactions: the amount branch and sort use amount, and the
+    # regex branch scans description keys instead of whole documents.
+    "transactions": [
+        ([("account_id", 1), ("timestamp", -1)], {}),
+        ([("amount", -1)], {}),
+        ([("description", 1)], {}),
+    ],
+}
+
+
 # -- Response model -----------------------------------------------------------
 
 class SeedResponse(BaseModel):
@@ -55,61 +92,30 @@ class SeedResponse(BaseModel):
 @demo_router.post("/seed", response_model=SeedResponse)
 def seed_demo():
     """Drop all sentinel + banking collections and re-seed demo data."""
-    db = mdb.get_db()
-
-    # Drop sentinel collections
-    for coll in ["agents", "policies", "audit_log", "pending_approvals", "counters"]:
-        db[coll].drop()
-
-    # Drop banking collections
-    db.customers.drop()
-    db.accounts.drop()
-    db.transactions.drop()
-
-    # Seed customers
-    cust_id = 1
-    for name, ssn, cc, phone, email, addr, dob in CUSTOMERS:
-        db.customers.insert_one({
-            "id": cust_id,
-            "name": name,
-            "ssn": ssn,
-            "credit_card_number": cc,
-            "phone": phone,
-            "email": email,
-            "address": addr,
-            "dob": dob,
-        })
-        cust_id += 1
-    cust_count = len(CUSTOMERS)
-
-    # Seed accounts
-    acc_count = 0
-    acc_id = 1
-    account_ids = []
-    for c_id in range(1, cust_count + 1):
+    # Synthetic data that is rebuilt on demand: acknowledge on the primary
+    # alone instead of waiting for a majority of the replica set.
+    db = mdb.get_db().with_options(write_concern=WriteConcern(w=1))
+
+    # Build every seed document up front; the inserts below run concurrently.
+    # insert_many adds _id to each document, so insert copies of the static set.
+    customers = [dict(doc) for doc in CUSTOMER_DOCS]
+
+    accounts = []
+    for c_id in range(1, len(customers) + 1):
         num_accounts = random.choice([1, 2])
         for i in range(num_accounts):
-            acc_type = ACCOUNT_TYPES[i % 2]
-            balance = round(random.uniform(500, 50000), 2)
-            db.accounts.insert_one({
-                "id": acc_id,
+            accounts.append({
+                "id": len(accounts) + 1,
                 "customer_id": c_id,
-                "account_type": acc_type,
-                "balance": balance,
+                "account_type": ACCOUNT_TYPES[i % 2],
+                "balance": round(random.uniform(500, 50000), 2),
                 "status": "active",
             })
-            account_ids.append(acc_id)
-            acc_id += 1
-            acc_count += 1
 
-    # Seed transactions
-    tx_count = 0
-    tx_id = 1
+    transactions = []
     now = datetime.now()
-    for a_id in account_ids:
-        num_tx = random.randint(5, 8)
-        for _ in range(num_tx):
-            tx_type = random.choice(["debit", "credit"])
+    for account in accounts:
+        for tx_type in random.choices(["debit", "credit"], k=random.randint(5, 8)):
             if tx_type == "debit":
                 amount = round(random.uniform(5, 500), 2)
                 desc = random.choice(TX_DESCRIPTIONS_DEBIT)
@@ -117,15 +123,33 @@ def seed_demo():
                 amount = round(random.uniform(100, 5000), 2)
                 desc = random.choice(TX_DESCRIPTIONS_CREDIT)
             ts = (now - timedelta(days=random.randint(0, 90), hours=random.randint(0, 23))).strftime("%Y-%m-%d %H:%M:%S")
-            db.transactions.insert_one({
-                "id": tx_id,
-                "account_id": a_id,
+            transactions.append({
+                "id": len(transactions) + 1,
+                "account_id": account["id"],
                 "type": tx_type,
                 "amount": amount,
                 "description": desc,
                 "timestamp": ts,
             })
-            tx_id += 1
-            tx_count += 1
 
+    seed = {"customers": customers, "accounts": accounts, "transactions": transactions}
+
+    def load(coll: str) -> None:
+        # Dropping a collection drops its indexes, so rebuild them each seed.
+        for keys, options in SEED_INDEXES[coll]:
+            db[coll].create_index(keys, **options)
+        db[coll].insert_many(seed[coll], ordered=False)
+
+    # The drops, and then the loads, are independent of each other, so
+    # each phase costs one round trip instead of one per collection.
+    with ThreadPoolExecutor(max_workers=len(SEED_DROP_COLLECTIONS)) as pool:
+        list(pool.map(lambda coll: db[coll].drop(), SEED_DROP_COLLECTIONS))
+        list(pool.map(load, seed))
+
+    # Every dashboard collection was just replaced. The counters restarted
+    # too, so start a new data version epoch: every instance's cached
+    # responses and every client ETag from before the seed stop matching.
+    mdb.bump_data_epoch()
+
+    cust_count, acc_count, tx_count = len(customers), len(accounts), len(transactions)
     return SeedResponse(customers=cust_count, accounts=acc_count, transactions=tx_count)
@@ -8,13 +8,15 @@ tagged with it. Dashboard endpoints filter by the current session so only
 fresh data is displayed — old sessions stay in the DB for history.
 """
 
+import hashlib
 import os
 import uuid
 from typing import Optional
 from datetime import datetime
 
 import pymongo
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,16 +24,56 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 DB_NAME = os.getenv("MONGO_DB_NAME", "sentinel_db")
 
-_CLIENT = None
+
+def _parse_ttl_days(raw: Optional[str]) -> int:
+    """Retention in days from *raw*; 0 (disabled) when unset or <= 0."""
+    if not raw or not raw.strip():
+        return 0
+    try:
+        days = int(raw)
+    except ValueError:
+        raise ValueError(
+            f"AUDIT_LOG_TTL_DAYS must be a whole number of days, got {raw!r}"
+        ) from None
+    return max(days, 0)
+
+
+# Optional retention for audit entries; 0 keeps history forever.
+AUDIT_LOG_TTL_DAYS = _parse_ttl_days(os.getenv("AUDIT_LOG_TTL_DAYS"))
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# One client per process, created at import. MongoClient connects lazily and
+# is thread-safe, so every request (and warm serverless invocation) reuses
+# the same connection pool instead of paying the TCP + TLS + auth handshake.
+# A few connections are kept warm, and a request that cannot get one within
+# waitQueueTimeoutMS fails fast instead of queueing behind a burst.
+_CLIENT = MongoClient(
+    MONGO_URI,
+    maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "5")),
+    waitQueueTimeoutMS=5000,
+    connectTimeoutMS=5000,
+    socketTimeoutMS=10000,
+    serverSelectionTimeoutMS=5000,
+    retryWrites=True,
+)
+_DB = _CLIENT[DB_NAME]
 _current_session_id: Optional[str] = None
 
 
 def get_db():
-    """Get the MongoDB database object. Reuses the client."""
-    global _CLIENT
-    if _CLIENT is None:
-        _CLIENT = MongoClient(MONGO_URI)
-    return _CLIENT[DB_NAME]
+    """Get the MongoDB database object from the shared client."""
+    return _DB
+
+
+def format_timestamp(value):
+    """Render a stored BSON Date as the API's timestamp string.
+
+    Documents written before timestamps were stored as dates hold the
+    string already and pass through unchanged, as does None.
+    """
+    return value.strftime(TIMESTAMP_FORMAT) if isinstance(value, datetime) else value
 
 
 def get_current_session_id() -> Optional[str]:
@@ -41,14 +83,53 @@ def get_current_session_id() -> Optional[str]:
 
 def _get_next_sequence(collection_name: str) -> int:
     """Simulate AUTOINCREMENT for IDs using a counters collection."""
-    db = get_db()
-    ret = db.counters.find_one_and_update(
+    return _reserve_sequence(collection_name, 1)
+
+
+def _reserve_sequence(collection_name: str, n: int) -> int:
+    """Reserve *n* consecutive ids in one round trip; returns the first."""
+    ret = get_db().counters.find_one_and_update(
         {"_id": collection_name},
-        {"$inc": {"seq": 1}},
+        {"$inc": {"seq": n}},
         upsert=True,
         return_document=pymongo.ReturnDocument.AFTER,
     )
-    return ret["seq"]
+    return ret["seq"] - n + 1
+
+
+def _bump_state_version() -> None:
+    """Record a write that changes dashboard state without allocating an id."""
+    get_db().counters.update_one({"_id": "state"}, {"$inc": {"seq": 1}}, upsert=True)
+
+
+def get_data_version() -> str:
+    """Fingerprint of dashboard-visible state, used for HTTP ETags.
+
+    New audit entries and approvals advance their id sequences; other
+    writes (status changes, registrations, decisions) bump ``state``.
+    ``epoch`` changes whenever the data is reseeded, since that resets the
+    other counters to values earlier versions may already have used.
+    """
+    seqs = {
+        doc["_id"]: doc["seq"]
+        for doc in get_db().counters.find(
+            {"_id": {"$in": ["audit_log", "pending_approvals", "state", "epoch"]}}
+        )
+    }
+    return "{}-{}-{}-{}-{}".format(
+        _current_session_id,
+        seqs.get("epoch", 0),
+        seqs.get("audit_log", 0),
+        seqs.get("pending_approvals", 0),
+        seqs.get("state", 0),
+    )
+
+
+def bump_data_epoch() -> None:
+    """Start a new data epoch after the collections were dropped and reseeded."""
+    get_db().counters.replace_one(
+        {"_id": "epoch"}, {"seq": uuid.uuid4().hex[:12]}, upsert=True
+    )
 
 
 # -- Schema ------------------------------------------------------------------
@@ -68,6 +149,69 @@ def init_db() -> None:
     db.audit_log.create_index([("id", -1)])
     db.pending_approvals.create_index("id", unique=True)
 
+    # Dashboard queries always filter on session_id first (equality), then
+    # agent_name/status (equality), then sort or range on id/timestamp.
+    db.audit_log.create_index([("session_id", 1), ("agent_name", 1), ("status", 1)])
+    db.audit_log.create_index([("session_id", 1), ("status", 1), ("timestamp", -1)])
+    db.audit_log.create_index([("session_id", 1), ("agent_name", 1), ("id", -1)])
+    db.audit_log.create_index([("session_id", 1), ("id", -1)])
+    db.pending_approvals.create_index([("session_id", 1), ("status", 1), ("id", -1)])
+    db.agents.create_index([("session_id", 1), ("status", 1)])
+
+    # SDK hot paths: find_approval runs on every REVIEW-gated call, and
+    # the audit-log reader filters by agent before sorting on id.
+    db.pending_approvals.create_index(
+        [("agent_name", 1), ("action", 1), ("session_id", 1), ("id", -1)]
+    )
+    db.audit_log.create_index([("agent_name", 1), ("id", -1)])
+
+    # decide_approval resolves the PENDING audit entry by approval_id, or by
+    # (agent_name, action, status) for entries that predate that field.
+    db.audit_log.create_index(
+        "approval_id", partialFilterExpression={"approval_id": {"$exists": True}}
+    )
+    db.audit_log.create_index([("agent_name", 1), ("action", 1), ("status", 1)])
+
+    _sync_audit_ttl_index(db)
+
+
+AUDIT_TTL_INDEX = "audit_log_ttl"
+
+
+def _sync_audit_ttl_index(db) -> None:
+    """Make the audit_log TTL index match AUDIT_LOG_TTL_DAYS.
+
+    audit_log timestamps are BSON Dates, so MongoDB can expire them. A
+    changed retention is applied in place with collMod; unsetting the
+    variable (or setting it to 0 or less) drops the index so history is
+    kept again.
+    """
+    existing = db.audit_log.index_information().get(AUDIT_TTL_INDEX)
+    if not AUDIT_LOG_TTL_DAYS:
+        if existing:
+            _drop_index(db.audit_log, AUDIT_TTL_INDEX)
+        return
+
+    seconds = AUDIT_LOG_TTL_DAYS * 86400
+    if existing is None:
+        db.audit_log.create_index(
+            "timestamp", name=AUDIT_TTL_INDEX, expireAfterSeconds=seconds
+        )
+    elif existing.get("expireAfterSeconds") != seconds:
+        db.command(
+            "collMod", "audit_log",
+            index={"name": AUDIT_TTL_INDEX, "expireAfterSeconds": seconds},
+        )
+
+
+def _drop_index(collection, name: str) -> None:
+    try:
+        collection.drop_index(name)
+    except OperationFailure as exc:
+        # Another init may have dropped it first.
+        if exc.code != 27:  # IndexNotFound
+            raise
+
 
 # -- Queries ------------------------------------------------------------------
 
@@ -91,40 +235,102 @@ def get_all_policies(agent_name: str) -> list:
     return list(cursor)
 
 
+def get_policies_for_agents(agent_names: Optional[list] = None) -> list:
+    """All policy rules for *agent_names* (every agent if None) in one query."""
+    query = {"agent_name": {"$in": agent_names}} if agent_names else {}
+    cursor = get_db().policies.find(
+        query, {"agent_name": 1, "action": 1, "rule_type": 1, "_id": 0}
+    )
+    return list(cursor)
+
+
 # -- Writes -------------------------------------------------------------------
 
+def _audit_doc(
+    entry_id: int,
+    timestamp: datetime,
+    agent_name: str,
+    action: str,
+    status: str,
+    details: str = "",
+    approval_id: Optional[int] = None,
+) -> dict:
+    doc = {
+        "id": entry_id,
+        "timestamp": timestamp,
+        "agent_name": agent_name,
+        "action": action,
+        "status": status,
+        "details": details,
+        "session_id": _current_session_id,
+    }
+    # Links a PENDING entry to its approval so decide_approval can find it
+    # with an exact match instead of a regex over details.
+    if approval_id is not None:
+        doc["approval_id"] = approval_id
+    return doc
+
+
 def log_event(
     agent_name: str,
     action: str,
     status: str,
     details: str = "",
+    approval_id: Optional[int] = None,
 ) -> None:
-    db = get_db()
-    new_id = _get_next_sequence("audit_log")
-    db.audit_log.insert_one(
-        {
-            "id": new_id,
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-            "agent_name": agent_name,
-            "action": action,
-            "status": status,
-            "details": details,
-            "session_id": _current_session_id,
-        }
+    get_db().audit_log.insert_one(_audit_doc(
+        _get_next_sequence("audit_log"), datetime.utcnow(),
+        agent_name, action, status, details, approval_id,
+    ))
+
+
+def log_events(entries: list[dict]) -> None:
+    """Insert many audit entries (``agent_name``, ``action``, ``status``,
+    optional ``details`` and ``approval_id``) with one ``insert_many``."""
+    if not entries:
+        return
+    base = _reserve_sequence("audit_log", len(entries))
+    now = datetime.utcnow()
+    get_db().audit_log.insert_many(
+        [
+            _audit_doc(
+                base + i, now, e["agent_name"], e["action"], e["status"],
+                e.get("details", ""), e.get("approval_id"),
+            )
+            for i, e in enumerate(entries)
+        ],
+        ordered=False,
     )
 
 
-def update_status(name: str, status: str) -> None:
-    get_db().agents.update_one({"name": name}, {"$set": {"status": status}})
+def update_status(name: str, status: str, session_id: Optional[str] = None) -> bool:
+    """Set an agent's status. Returns False if no agent matched.
+
+    Pass *session_id* to only match the agent within that session.
+    """
+    query = {"name": name}
+    if session_id:
+        query["session_id"] = session_id
+    result = get_db().agents.update_one(query, {"$set": {"status": status}})
+    if result.matched_count == 0:
+        return False
+    _bump_state_version()
+    return True
+
+
+def agent_id_for(name: str) -> str:
+    """Stable dashboard ID for an agent name (AGT-{hash})."""
+    return "AGT-" + hashlib.sha256(name.encode()).hexdigest()[:8]
 
 
 def upsert_agent(name: str, owner: str = "") -> None:
     db = get_db()
-    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    now = datetime.utcnow()
     db.agents.update_one(
         {"name": name},
         {
             "$set": {
+                "agent_id": agent_id_for(name),
                 "owner": owner,
                 "status": "REGISTERED",
                 "session_id": _current_session_id,
@@ -134,6 +340,7 @@ def upsert_agent(name: str, owner: str = "") -> None:
         },
         upsert=True,
     )
+    _bump_state_version()
 
 
 def upsert_policy(agent_name: str, action: str, rule_type: str) -> None:
@@ -144,6 +351,23 @@ def upsert_policy(agent_name: str, action: str, rule_type: str) -> None:
     )
 
 
+def upsert_policies(agent_name: str, rules: dict[str, str]) -> None:
+    """Upsert every ``action -> rule_type`` pair for an agent in one bulk write."""
+    if not rules:
+        return
+    get_db().policies.bulk_write(
+        [
+            UpdateOne(
+                {"agent_name": agent_name, "action": action},
+                {"$set": {"rule_type": rule_type, "session_id": _current_session_id}},
+                upsert=True,
+            )
+            for action, rule_type in rules.items()
+        ],
+        ordered=False,
+    )
+
+
 # -- Approval helpers ---------------------------------------------------------
 
 def create_approval(
@@ -151,7 +375,7 @@ def create_approval(
 ) -> int:
     db = get_db()
     new_id = _get_next_sequence("pending_approvals")
-    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    now = datetime.utcnow()
     db.pending_approvals.insert_one(
         {
             "id": new_id,
@@ -172,34 +396,45 @@ def get_approval_status(approval_id: int) -> Optional[str]:
     return doc["status"] if doc else None
 
 
-def decide_approval(approval_id: int, decision: str) -> None:
-    db = get_db()
-    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+def decide_approval(approval_id: int, decision: str) -> bool:
+    """Resolve a PENDING approval. Returns False if it was not PENDING.
 
-    # Look up the approval to get agent_name + action before updating
-    approval = db.pending_approvals.find_one({"id": approval_id})
+    The status check and update are a single atomic find_one_and_update,
+    so two reviewers racing on the same request cannot both decide it.
+    """
+    db = get_db()
+    now = datetime.utcnow()
 
-    # Update the pending_approvals record
-    db.pending_approvals.update_one(
-        {"id": approval_id},
+    approval = db.pending_approvals.find_one_and_update(
+        {"id": approval_id, "status": "PENDING"},
         {"$set": {"status": decision, "decided_at": now}},
+        projection={"_id": 0, "agent_name": 1, "action": 1},
     )
+    if approval is None:
+        return False
 
     # Update the original PENDING audit_log entry so the firewall decision
     # graph reflects the resolved status, not a stale "PENDING".
-    if approval:
+    resolved = {"$set": {
+        "status": decision,
+        "details": f"Approval #{approval_id} — {decision.lower()} by human reviewer.",
+    }}
+    result = db.audit_log.update_one(
+        {"approval_id": approval_id, "status": "PENDING"}, resolved
+    )
+    if result.matched_count == 0:
+        # Entries logged by older SDKs carry the id only in details.
         db.audit_log.update_one(
             {
                 "agent_name": approval["agent_name"],
                 "action": approval["action"],
                 "status": "PENDING",
-                "details": {"$regex": f"Approval #{approval_id}"},
+                "details": {"$regex": f"Approval #{approval_id}\\b"},
             },
-            {"$set": {
-                "status": decision,
-                "details": f"Approval #{approval_id} — {decision.lower()} by human reviewer.",
-            }},
+            resolved,
         )
+    _bump_state_version()
+    return True
 
 
 def find_approval(agent_name: str, action: str) -> Optional[dict]:
@@ -207,9 +442,10 @@ def find_approval(agent_name: str, action: str) -> Optional[dict]:
     query = {"agent_name": agent_name, "action": action}
     if _current_session_id:
         query["session_id"] = _current_session_id
-    doc = get_db().pending_approvals.find_one(query, sort=[("id", -1)])
+    doc = get_db().pending_approvals.find_one(query, {"_id": 0}, sort=[("id", -1)])
     if doc:
-        doc.pop("_id", None)
+        doc["created_at"] = format_timestamp(doc.get("created_at"))
+        doc["decided_at"] = format_timestamp(doc.get("decided_at"))
     return doc
 
 
@@ -217,12 +453,22 @@ def get_pending_approvals() -> list:
     query = {"status": "PENDING"}
     if _current_session_id:
         query["session_id"] = _current_session_id
-    cursor = get_db().pending_approvals.find(query).sort("id", -1)
-    results = []
-    for doc in cursor:
-        doc.pop("_id", None)
-        results.append(doc)
-    return results
+    cursor = get_db().pending_approvals.find(
+        query,
+        {
+            "_id": 0,
+            "id": 1,
+            "agent_name": 1,
+            "action": 1,
+            "args_json": 1,
+            "status": 1,
+            "created_at": 1,
+        },
+    ).sort("id", -1)
+    rows = list(cursor)
+    for row in rows:
+        row["created_at"] = format_timestamp(row["created_at"])
+    return rows
 
 
 def get_audit_log(agent_name: Optional[str] = None, limit: int = 10) -> list:
@@ -232,9 +478,20 @@ def get_audit_log(agent_name: Optional[str] = None, limit: int = 10) -> list:
         query["session_id"] = _current_session_id
     if agent_name:
         query["agent_name"] = agent_name
-    cursor = db.audit_log.find(query).sort("id", -1).limit(limit)
-    rows = []
-    for doc in cursor:
-        doc.pop("_id", None)
-        rows.append(doc)
-    return list(reversed(rows))
+    cursor = db.audit_log.find(
+        query,
+        {
+            "_id": 0,
+            "id": 1,
+            "timestamp": 1,
+            "agent_name": 1,
+            "action": 1,
+            "status": 1,
+            "details": 1,
+        },
+    ).sort("id", -1).limit(limit)
+    rows = list(cursor)
+    rows.reverse()
+    for row in rows:
+        row["timestamp"] = format_timestamp(row["timestamp"])
+    return rows
@@ -3,13 +3,9 @@ Aegis Demo — Customer Support Agent
 All 17 tools are available to the LLM. Aegis policy is the only enforcement layer.
 """
 
-import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.prebuilt import create_react_agent
-
 from sentinel import agent
 
-from ..core import ALL_TOOLS, print_agent_banner, log_thought
+from ..core import ALL_TOOLS, get_agent_executor, print_agent_banner, log_thought, stream_agent
 
 # ── Policy: whitelist-only + hard blocks for known-dangerous actions ─────
 # The agent KNOWS about all 17 tools. It can TRY any of them.
@@ -30,14 +26,14 @@ class CustomerSupportAgent:
     pass
 
 
+# Wrapped once per process; every run() reuses the same tool copies.
+TOOLS = CustomerSupportAgent.wrap_tools(ALL_TOOLS)
+
+
 def run():
     digital_id = print_agent_banner(AGENT_NAME, AGENT_ROLE)
 
-    tools = CustomerSupportAgent.wrap_tools(ALL_TOOLS)
-
-    model = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash-lite")
-    llm = ChatGoogleGenerativeAI(model=model)
-    agent_executor = create_react_agent(llm, tools)
+    agent_executor = get_agent_executor(TOOLS)
 
     log_thought("Starting customer support session for customer #3")
 
@@ -49,7 +45,5 @@ def run():
         "Use the tools available to you. Be helpful and thorough."
     )
 
-    result = agent_executor.invoke({"messages": [("user", prompt)]})
-
-    final = result["messages"][-1].content
+    final = stream_agent(agent_executor, prompt)
     log_thought(f"Session complete. Summary: {final[:100]}...")
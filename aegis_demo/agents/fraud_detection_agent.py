@@ -4,13 +4,9 @@ All 17 tools available. Elevated policy allows SSN access for identity verificat
 Demonstrates: same tool (access_ssn) that gets REVIEW'd for Customer Support is ALLOWED here.
 """
 
-import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.prebuilt import create_react_agent
-
 from sentinel import agent
 
-from ..core import ALL_TOOLS, print_agent_banner, log_thought
+from ..core import ALL_TOOLS, get_agent_executor, print_agent_banner, log_thought, stream_agent
 
 # ── Policy: broader whitelist for fraud investigation ────────────────────
 # access_ssn is ALLOWED here — contrast with Customer Support where it hits REVIEW.
@@ -32,14 +28,14 @@ class FraudDetectionAgent:
     pass
 
 
+# Wrapped once per process; every run() reuses the same tool copies.
+TOOLS = FraudDetectionAgent.wrap_tools(ALL_TOOLS)
+
+
 def run():
     digital_id = print_agent_banner(AGENT_NAME, AGENT_ROLE)
 
-    tools = FraudDetectionAgent.wrap_tools(ALL_TOOLS)
-
-    model = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash-lite")
-    llm = ChatGoogleGenerativeAI(model=model)
-    agent_executor = create_react_agent(llm, tools)
+    agent_executor = get_agent_executor(TOOLS)
 
     log_thought("Starting fraud scan on recent transactions")
 
@@ -52,7 +48,5 @@ def run():
         "You have elevated privileges including SSN access for identity verification. Use your tools."
     )
 
-    result = agent_executor.invoke({"messages": [("user", prompt)]})
-
-    final = result["messages"][-1].content
+    final = stream_agent(agent_executor, prompt)
     log_thought(f"Fraud scan complete. Summary: {final[:100]}...")
@@ -4,13 +4,9 @@ All 17 tools available. Narrow whitelist. LLM autonomously attempts tools beyond
 Demonstrates: autonomous over-reach caught by whitelist + hard blocks on dangerous actions.
 """
 
-import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.prebuilt import create_react_agent
-
 from sentinel import agent
 
-from ..core import ALL_TOOLS, print_agent_banner, log_thought
+from ..core import ALL_TOOLS, get_agent_executor, print_agent_banner, log_thought, stream_agent
 
 # ── Policy: narrow whitelist for loan processing ─────────────────────────
 # The LLM will try access_ssn, access_credit_card etc. to be "thorough".
@@ -29,14 +25,14 @@ class LoanProcessorAgent:
     pass
 
 
+# Wrapped once per process; every run() reuses the same tool copies.
+TOOLS = LoanProcessorAgent.wrap_tools(ALL_TOOLS)
+
+
 def run():
     digital_id = print_agent_banner(AGENT_NAME, AGENT_ROLE)
 
-    tools = LoanProcessorAgent.wrap_tools(ALL_TOOLS)
-
-    model = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash-lite")
-    llm = ChatGoogleGenerativeAI(model=model)
-    agent_executor = create_react_agent(llm, tools)
+    agent_executor = get_agent_executor(TOOLS)
 
     log_thought("Processing loan application for customer #7")
 
@@ -54,7 +50,5 @@ def run():
         "Complete ALL steps. If a tool returns an error, note the error and move on to the next step."
     )
 
-    result = agent_executor.invoke({"messages": [("user", prompt)]})
-
-    final = result["messages"][-1].content
+    final = stream_agent(agent_executor, prompt)
     log_thought(f"Loan processing complete. Summary: {final[:100]}...")
@@ -4,13 +4,9 @@ All 17 tools available. Narrow whitelist. Attempts sensitive data access and bul
 Demonstrates: REVIEW for undeclared actions + hard BLOCK for known-dangerous ones.
 """
 
-import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.prebuilt import create_react_agent
-
 from sentinel import agent
 
-from ..core import ALL_TOOLS, print_agent_banner, log_thought
+from ..core import ALL_TOOLS, get_agent_executor, print_agent_banner, log_thought, stream_agent
 
 # ── Policy: minimal whitelist for marketing ──────────────────────────────
 # export_customer_list is NOT in allowed or blocked → REVIEW (HITL demo).
@@ -30,14 +26,14 @@ class MarketingOutreachAgent:
     pass
 
 
+# Wrapped once per process; every run() reuses the same tool copies.
+TOOLS = MarketingOutreachAgent.wrap_tools(ALL_TOOLS)
+
+
 def run():
     digital_id = print_agent_banner(AGENT_NAME, AGENT_ROLE)
 
-    tools = MarketingOutreachAgent.wrap_tools(ALL_TOOLS)
-
-    model = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash-lite")
-    llm = ChatGoogleGenerativeAI(model=model)
-    agent_executor = create_react_agent(llm, tools)
+    agent_executor = get_agent_executor(TOOLS)
 
     log_thought("Starting marketing campaign: Spring Savings Promo")
 
@@ -56,7 +52,5 @@ def run():
         "If any tool returns an error, note it and continue to the next tool."
     )
 
-    result = agent_executor.invoke({"messages": [("user", prompt)]})
-
-    final = result["messages"][-1].content
+    final = stream_agent(agent_executor, prompt)
     log_thought(f"Campaign complete. Summary: {final[:100]}...")
@@ -1,3 +1,4 @@
+from .llm import get_agent_executor, stream_agent
 from .mock_aegis import C, get_agent_stats, print_agent_banner, log_thought
 from .tools import (
     lookup_balance,
@@ -5,7 +5,9 @@ But the demo's banking tools (lookup_balance, etc.) need to query
 customer/account/transaction data. This module provides that connection.
 """
 
+import atexit
 import os
+import threading
 
 from pymongo import MongoClient
 from dotenv import load_dotenv
@@ -16,11 +18,28 @@ MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 DB_NAME = os.getenv("MONGO_DB_NAME", "sentinel_db")
 
 _CLIENT = None
+_DB = None
+_CLIENT_LOCK = threading.Lock()
 
 
 def get_db():
-    """Get the MongoDB database for banking data queries."""
-    global _CLIENT
-    if _CLIENT is None:
-        _CLIENT = MongoClient(MONGO_URI)
-    return _CLIENT[DB_NAME]
+    """Get the MongoDB database for banking data queries.
+
+    The agents run in parallel threads, so the shared client and database
+    handle are created once under a lock; every tool call then reuses them.
+    """
+    global _CLIENT, _DB
+    if _DB is None:
+        with _CLIENT_LOCK:
+            if _DB is None:
+                _CLIENT = MongoClient(
+                    MONGO_URI,
+                    maxPoolSize=50,
+                    minPoolSize=5,
+                    maxIdleTimeMS=30000,
+                    connectTimeoutMS=5000,
+                    serverSelectionTimeoutMS=5000,
+                )
+                atexit.register(_CLIENT.close)
+                _DB = _CLIENT[DB_NAME]
+    return _DB
@@ -0,0 +1,60 @@
+"""Shared chat model and agent graphs for the demo agents.
+
+Every agent talks to the same Gemini model, so the client is built once
+per model name and reused across ``run()`` calls instead of re-reading
+credentials and opening a fresh HTTP client each time. The compiled
+ReAct graph is likewise built once per (model, tool set).
+"""
+
+import os
+from functools import lru_cache
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langgraph.prebuilt import create_react_agent
+
+from .mock_aegis import log_thought
+
+DEFAULT_MODEL = "gemini-2.5-flash-lite"
+
+
+@lru_cache(maxsize=None)
+def _llm_for(model: str) -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(model=model)
+
+
+# Keyed by tool identity (tools are unhashable Pydantic models). wrap_tools
+# returns fresh copies on every call, so this only hits because each agent
+# module wraps its tools once into a module-level TOOLS list and passes that
+# same list on every run(). Each cached graph holds its tools, so the ids
+# stay valid for the cache's lifetime.
+_executors: dict = {}
+
+
+def get_agent_executor(tools: list):
+    """Return a ReAct agent over *tools* on the shared model, built once."""
+    model = os.environ.get("GEMINI_MODEL", DEFAULT_MODEL)
+    key = (model, tuple(map(id, tools)))
+    if key not in _executors:
+        _executors[key] = create_react_agent(_llm_for(model), tools)
+    return _executors[key]
+
+
+def stream_agent(agent_executor, prompt: str) -> str:
+    """Run a ReAct agent on *prompt*, logging each tool call as it finishes.
+
+    Streams graph states instead of blocking on ``invoke`` so the terminal
+    shows progress live. Only the tool name and outcome are logged — tool
+    output can be an SSN or card number. Returns the final message's content.
+    """
+    seen = 0
+    messages = []
+    for state in agent_executor.stream(
+        {"messages": [("user", prompt)]}, stream_mode="values"
+    ):
+        messages = state["messages"]
+        for msg in messages[seen:]:
+            if msg.type == "tool":
+                outcome = "failed" if getattr(msg, "status", "success") == "error" else "succeeded"
+                log_thought(f"{msg.name} {outcome}")
+        seen = len(messages)
+    return messages[-1].content if messages else ""
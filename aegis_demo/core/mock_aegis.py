@@ -5,7 +5,9 @@ firewall decisions to the terminal. No SDK logic lives here.
 """
 
 import hashlib
-from datetime import datetime
+import threading
+import time
+from functools import lru_cache
 from typing import Optional
 
 from sentinel.decorators import set_monitor_hook
@@ -33,13 +35,40 @@ class C:
 
 _agent_stats: dict = {}
 
+# run_demo runs every agent in its own thread; serialize terminal output
+# and stats updates so lines from concurrent agents never interleave.
+_output_lock = threading.Lock()
 
+# (digital_id, action, decision) → times printed in the current run, so an
+# agent retrying a blocked action on a later turn is shown as a repeat even
+# when thoughts and other agents' lines were printed in between.
+_decision_counts: dict = {}
+
+
+@lru_cache(maxsize=None)
 def generate_digital_id(name: str) -> str:
-    """Generate a unique agent ID (AGT-0x{hash})."""
+    """Generate a unique agent ID (AGT-0x{hash}).
+
+    Cached: the terminal hook resolves it on every firewall decision.
+    """
     h = hashlib.sha256(name.encode()).hexdigest()[:4].upper()
     return f"AGT-0x{h}"
 
 
+# (epoch second, "HH:MM:SS") — log lines arrive in bursts, so format each
+# second once. Replaced as a single tuple, so threads never see a torn pair.
+_clock = (0, "")
+
+
+def _now_hms() -> str:
+    """Current local time as HH:MM:SS, formatted at most once per second."""
+    global _clock
+    now = int(time.time())
+    if _clock[0] != now:
+        _clock = (now, time.strftime("%H:%M:%S", time.localtime(now)))
+    return _clock[1]
+
+
 def get_agent_stats() -> dict:
     """Return the stats dict: {digital_id: {"name": str, "stats": {...}}}."""
     return _agent_stats
@@ -56,45 +85,57 @@ def print_agent_banner(name: str, role: str) -> str:
         "name": name,
         "stats": {"allowed": 0, "blocked": 0, "review": 0, "killed": 0},
     }
-    print(f"\n{C.CYAN}{C.BOLD}{'━' * 50}{C.RESET}")
-    print(f" {C.BOLD}Agent: {name} | {digital_id}{C.RESET}")
-    print(f" {C.DIM}Role: {role}{C.RESET}")
-    print(f" {C.DIM}Framework: LangChain + Gemini{C.RESET}")
-    print(f"{C.CYAN}{C.BOLD}{'━' * 50}{C.RESET}")
+    with _output_lock:
+        # A new run of this agent starts its repeat counts over.
+        for key in [k for k in _decision_counts if k[0] == digital_id]:
+            del _decision_counts[key]
+        print(f"\n{C.CYAN}{C.BOLD}{'━' * 50}{C.RESET}")
+        print(f" {C.BOLD}Agent: {name} | {digital_id}{C.RESET}")
+        print(f" {C.DIM}Role: {role}{C.RESET}")
+        print(f" {C.DIM}Framework: LangChain + Gemini{C.RESET}")
+        print(f"{C.CYAN}{C.BOLD}{'━' * 50}{C.RESET}")
     return digital_id
 
 
 def log_thought(message: str):
     """Print a timestamped thought to the terminal."""
-    ts = datetime.now().strftime("%H:%M:%S")
-    print(f"  {C.DIM}[{ts}] [THOUGHT] {message}{C.RESET}")
+    ts = _now_hms()
+    with _output_lock:
+        print(f"  {C.DIM}[{ts}] [THOUGHT] {message}{C.RESET}")
 
 
 # ---------------------------------------------------------------------------
 # Monitor hook — prints colored firewall decisions to the terminal
 # ---------------------------------------------------------------------------
 
+# decision → (stats key, ANSI style, label), built once instead of per call
+_DECISION_STYLES = {
+    "ALLOWED": ("allowed", C.GREEN, "ALLOWED"),
+    "BLOCKED": ("blocked", C.RED + C.BOLD, "BLOCKED"),
+    "KILLED": ("killed", C.BG_RED + C.WHITE, "KILLED"),
+    "PENDING": ("review", C.YELLOW, "PENDING APPROVAL"),
+}
+
+
 def _terminal_hook(agent_name: str, action: str, decision: str) -> Optional[Exception]:
     """Print firewall decisions to the terminal and update in-memory stats."""
     digital_id = generate_digital_id(agent_name)
-    if digital_id not in _agent_stats:
+    if digital_id not in _agent_stats or decision not in _DECISION_STYLES:
         return None
 
-    stats = _agent_stats[digital_id]["stats"]
-    ts = datetime.now().strftime("%H:%M:%S")
-
-    if decision == "ALLOWED":
-        stats["allowed"] += 1
-        print(f"  {C.GREEN}[{ts}] [{digital_id}] ALLOWED → {action}{C.RESET}")
-    elif decision == "BLOCKED":
-        stats["blocked"] += 1
-        print(f"  {C.RED}{C.BOLD}[{ts}] [{digital_id}] BLOCKED → {action}{C.RESET}")
-    elif decision == "KILLED":
-        stats["killed"] += 1
-        print(f"  {C.BG_RED}{C.WHITE}[{ts}] [{digital_id}] KILLED → {action}{C.RESET}")
-    elif decision == "PENDING":
-        stats["review"] += 1
-        print(f"  {C.YELLOW}[{ts}] [{digital_id}] PENDING APPROVAL → {action}{C.RESET}")
+    key, style, label = _DECISION_STYLES[decision]
+    ts = _now_hms()
+    line = f"  {style}[{ts}] [{digital_id}] {label} → {action}{C.RESET}"
+
+    with _output_lock:
+        _agent_stats[digital_id]["stats"][key] += 1
+        # An agent retrying the same action: tag the line with a repeat
+        # count. No cursor movement — run_demo, the thread wrappers and the
+        # SDK logger also write to the terminal without taking this lock.
+        current = (digital_id, action, decision)
+        count = _decision_counts.get(current, 0) + 1
+        _decision_counts[current] = count
+        print(f"{line} (x{count})" if count > 1 else line)
 
     return None
 
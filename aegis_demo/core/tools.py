@@ -4,11 +4,57 @@ All tool functions query the MongoDB 'sentinel_db' database.
 """
 
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional
+
 from langchain_core.tools import tool
 
 from .demo_db import get_db
 
+
+# Non-sensitive customer fields, cached for the whole demo run. SSN, DOB,
+# card and phone numbers are never cached: the tools that need them read
+# them live with their own projection.
+_CUSTOMER_FIELDS = {"_id": 0, "name": 1, "email": 1}
+_customers: dict = {}
+
+
+def _customer(customer_id: int) -> Optional[dict]:
+    """Name and email of a customer, fetched once and shared by every tool.
+
+    Customers are static seed data that no tool modifies. Unknown ids are
+    not cached, so a customer seeded later is still found.
+    """
+    row = _customers.get(customer_id)
+    if row is None:
+        row = get_db().customers.find_one({"id": customer_id}, _CUSTOMER_FIELDS)
+        if row is not None:
+            _customers[customer_id] = row
+    return row
+
+
+_COUNTS_TTL = 5.0
+_counts: Optional[tuple] = None  # (expires, (customers, accounts, transactions))
+
+# Shared by every report refresh instead of a pool per call.
+_COUNT_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="demo-count")
+
+
+def _collection_counts() -> tuple:
+    """Collection totals for reports, reused for _COUNTS_TTL seconds."""
+    global _counts
+    now = time.monotonic()
+    if _counts is None or _counts[0] <= now:
+        db = get_db()
+        collections = (db.customers, db.accounts, db.transactions)
+        # Unfiltered totals — collection metadata, no scan. The three
+        # requests are independent, so they share one round trip of latency.
+        counts = tuple(_COUNT_POOL.map(lambda coll: coll.estimated_document_count(), collections))
+        _counts = (now + _COUNTS_TTL, counts)
+    return _counts[1]
+
 # ─── Tool Functions ───────────────────────────────────────────────
 
 @tool
@@ -18,7 +64,7 @@ def lookup_balance(customer_id: int) -> str:
 
     rows = list(db.accounts.find(
         {"customer_id": customer_id},
-        {"account_type": 1, "balance": 1, "status": 1}
+        {"_id": 0, "account_type": 1, "balance": 1, "status": 1}
     ))
 
     if not rows:
@@ -38,7 +84,7 @@ def get_transaction_history(customer_id: int) -> str:
     """Get recent transaction history for a customer by their customer ID."""
     db = get_db()
 
-    current_accounts = list(db.accounts.find({"customer_id": customer_id}, {"id": 1}))
+    current_accounts = list(db.accounts.find({"customer_id": customer_id}, {"_id": 0, "id": 1}))
     acc_ids = [a["id"] for a in current_accounts]
 
     if not acc_ids:
@@ -68,8 +114,7 @@ def get_transaction_history(customer_id: int) -> str:
 @tool
 def send_notification(customer_id: int, message: str) -> str:
     """Send a notification to a customer. Provide customer_id and message."""
-    db = get_db()
-    row = db.customers.find_one({"id": customer_id}, {"name": 1, "email": 1})
+    row = _customer(customer_id)
 
     if not row:
         return f"Customer {customer_id} not found."
@@ -81,14 +126,22 @@ def scan_transactions(pattern: str) -> str:
     """Scan all transactions for suspicious patterns matching the given search string."""
     db = get_db()
 
-    cursor = db.transactions.find({
-        "$or": [
-            {"description": {"$regex": pattern, "$options": "i"}},
-            {"amount": {"$gt": 2000}}
-        ]
-    }).sort("amount", -1).limit(10)
-
-    rows = list(cursor)
+    rows = list(db.transactions.aggregate([
+        {"$match": {
+            "$or": [
+                {"description": {"$regex": pattern, "$options": "i"}},
+                {"amount": {"$gt": 2000}}
+            ]
+        }},
+        {"$sort": {"amount": -1}},
+        {"$limit": 10},
+        {"$lookup": {
+            "from": "accounts",
+            "localField": "account_id",
+            "foreignField": "id",
+            "as": "account"
+        }},
+    ]))
 
     if not rows:
         return f"No suspicious transactions matching '{pattern}'."
@@ -96,8 +149,7 @@ def scan_transactions(pattern: str) -> str:
     lines = [f"Suspicious transactions matching '{pattern}':"]
     for row in rows:
         tid = row["id"]
-        acc = db.accounts.find_one({"id": row["account_id"]}, {"customer_id": 1})
-        cid = acc["customer_id"] if acc else "?"
+        cid = row["account"][0]["customer_id"] if row["account"] else "?"
 
         tx_type = row["type"]
         amount = row["amount"]
@@ -133,8 +185,7 @@ def verify_identity(customer_id: int) -> str:
 @tool
 def check_credit_score(customer_id: int) -> str:
     """Check credit score for a customer (simulated)."""
-    db = get_db()
-    row = db.customers.find_one({"id": customer_id}, {"name": 1})
+    row = _customer(customer_id)
 
     if not row:
         return f"Customer {customer_id} not found."
@@ -146,8 +197,7 @@ def check_credit_score(customer_id: int) -> str:
 @tool
 def process_application(customer_id: int, amount: float) -> str:
     """Process a loan application for a customer with a given amount."""
-    db = get_db()
-    row = db.customers.find_one({"id": customer_id}, {"name": 1})
+    row = _customer(customer_id)
 
     if not row:
         return f"Customer {customer_id} not found."
@@ -202,8 +252,7 @@ def connect_external(server: str, data: str) -> str:
 @tool
 def get_customer_preferences(customer_id: int) -> str:
     """Get customer communication preferences (non-sensitive)."""
-    db = get_db()
-    row = db.customers.find_one({"id": customer_id}, {"name": 1})
+    row = _customer(customer_id)
 
     if not row:
         return f"Customer {customer_id} not found."
@@ -214,8 +263,7 @@ def get_customer_preferences(customer_id: int) -> str:
 @tool
 def send_promo_email(customer_id: int, campaign: str) -> str:
     """Send a promotional email to a customer for a given campaign."""
-    db = get_db()
-    row = db.customers.find_one({"id": customer_id}, {"name": 1, "email": 1})
+    row = _customer(customer_id)
 
     if not row:
         return f"Customer {customer_id} not found."
@@ -225,10 +273,7 @@ def send_promo_email(customer_id: int, campaign: str) -> str:
 @tool
 def generate_report(report_type: str) -> str:
     """Generate an analytics report of the given type."""
-    db = get_db()
-    cust_count = db.customers.count_documents({})
-    acc_count = db.accounts.count_documents({})
-    tx_count = db.transactions.count_documents({})
+    cust_count, acc_count, tx_count = _collection_counts()
 
     return (
         f"Report: {report_type}\n"
@@ -243,12 +288,8 @@ def generate_report(report_type: str) -> str:
 def export_customer_list() -> str:
     """Export the full customer list with names and emails."""
     db = get_db()
-    rows = list(db.customers.find({}, {"id": 1, "name": 1, "email": 1}))
+    cursor = db.customers.find({}, {"_id": 0, "id": 1, "name": 1, "email": 1})
 
-    lines = ["Exported customer list:"]
-    for row in rows:
-        cid = row["id"]
-        name = row["name"]
-        email = row["email"]
-        lines.append(f"  {cid}. {name} ({email})")
-    return "\n".join(lines)
+    # Format straight off the cursor; no intermediate list of documents.
+    lines = (f"  {row['id']}. {row['name']} ({row['email']})" for row in cursor)
+    return "\n".join(["Exported customer list:", *lines])
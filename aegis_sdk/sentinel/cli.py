@@ -26,6 +26,7 @@ def revive_agent(name: str) -> None:
 
 def show_audit_log(name: str, limit: int = 10) -> None:
     """Print the last *limit* audit-log entries for an agent."""
+    db.flush_log_events()
     rows = db.get_audit_log(name, limit)
     if not rows:
         print(f"No audit-log entries for '{name}'.")
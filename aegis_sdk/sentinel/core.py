@@ -6,7 +6,7 @@ No caching — true real-time polling.
 """
 
 import time
-from typing import List, Optional
+from typing import Callable, List, Optional, Union
 
 from sentinel import db
 from sentinel.exceptions import (
@@ -17,6 +17,10 @@ from sentinel.exceptions import (
 
 APPROVAL_POLL_INTERVAL = 2
 
+# Approval context: a JSON string, or a callable producing one. Callables
+# are only invoked when an approval is actually created.
+ArgsJson = Union[str, Callable[[], str]]
+
 _db_initialized = False
 
 
@@ -37,20 +41,19 @@ def register_agent(
         _db_initialized = True
     db.upsert_agent(name, owner)
 
-    for action in (allows or []):
-        db.upsert_policy(name, action, "ALLOW")
-
-    for action in (blocks or []):
-        db.upsert_policy(name, action, "BLOCK")
-
-    for action in (requires_review or []):
-        db.upsert_policy(name, action, "REVIEW")
+    # One request for every rule; later lists win on overlap, as before.
+    rules = {}
+    for rule_type, actions in (
+        ("ALLOW", allows), ("BLOCK", blocks), ("REVIEW", requires_review)
+    ):
+        rules.update(dict.fromkeys(actions or [], rule_type))
+    db.upsert_policies(name, rules)
 
 
 def validate_action(
     agent_name: str,
     action_name: str,
-    args_json: str = "{}",
+    args_json: ArgsJson = "{}",
 ) -> bool:
     """The polling check — queries the DB on every call.
 
@@ -63,13 +66,14 @@ def validate_action(
     Blocking only affects the calling thread. Run agents in separate
     threads so one agent waiting for approval doesn't block others.
     """
+    # Status and rule arrive in one round trip; still fetched fresh per call.
+    status, rule = db.check_action(agent_name, action_name)
+
     # Step 1: Kill-switch check
-    status = db.get_agent_status(agent_name)
     if status == "PAUSED":
         raise SentinelKillSwitchError(agent_name)
 
     # Step 2: Policy check
-    rule = db.get_policy(agent_name, action_name)
 
     if rule == "BLOCK":
         raise SentinelBlockedError(action_name)
@@ -85,7 +89,7 @@ def validate_action(
 
 
 def wait_for_approval(
-    agent_name: str, action_name: str, args_json: str
+    agent_name: str, action_name: str, args_json: ArgsJson
 ) -> bool:
     """Create a pending approval and block until the human decides.
 
@@ -118,10 +122,13 @@ def wait_for_approval(
         approval_id = aid
     else:
         # Create new approval
-        approval_id = db.create_approval(agent_name, action_name, args_json)
+        approval_id = db.create_approval(agent_name, action_name, _resolve_args_json(args_json))
+        # Queued tool-call entries must land first to keep ids in causal order.
+        db.flush_log_events()
         db.log_event(
             agent_name, action_name, "PENDING",
             f"Approval #{approval_id} — waiting for human decision.",
+            approval_id=approval_id,
         )
 
     # Poll forever until the human decides
@@ -141,7 +148,7 @@ def wait_for_approval(
 
 
 def request_approval(
-    agent_name: str, action_name: str, args_json: str
+    agent_name: str, action_name: str, args_json: ArgsJson
 ) -> bool:
     """Non-blocking approval request (alternative to wait_for_approval).
 
@@ -174,12 +181,18 @@ def request_approval(
             f"(Approval #{aid}). Retry later."
         )
 
-    approval_id = db.create_approval(agent_name, action_name, args_json)
+    approval_id = db.create_approval(agent_name, action_name, _resolve_args_json(args_json))
+    db.flush_log_events()
     db.log_event(
         agent_name, action_name, "PENDING",
         f"Approval #{approval_id} — waiting for human decision.",
+        approval_id=approval_id,
     )
     raise SentinelApprovalError(
         f"Action '{action_name}' requires human approval "
         f"(Approval #{approval_id}). Retry after approval."
     )
+
+
+def _resolve_args_json(args_json: ArgsJson) -> str:
+    return args_json() if callable(args_json) else args_json
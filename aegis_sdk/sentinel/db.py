@@ -7,8 +7,13 @@ Configure via environment variable:
     AEGIS_BACKEND_URL=https://your-aegis-backend.vercel.app
 """
 
+import atexit
+import logging
 import os
-from typing import Optional
+import queue
+import threading
+import time
+from typing import Optional, Tuple
 
 import httpx
 from dotenv import load_dotenv
@@ -16,6 +21,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 BACKEND_URL = os.getenv("AEGIS_BACKEND_URL", "http://localhost:8000")
+LOG_BATCH_SIZE = int(os.getenv("AEGIS_LOG_BATCH_SIZE", "128"))
+LOG_BATCH_MS = float(os.getenv("AEGIS_LOG_BATCH_MS", "50"))
+LOG_QUEUE_SIZE = int(os.getenv("AEGIS_LOG_QUEUE_SIZE", "10000"))
+LOG_RETRIES = 3
+LOG_FLUSH_TIMEOUT = 10.0
+
+logger = logging.getLogger(__name__)
 
 _client: Optional[httpx.Client] = None
 
@@ -39,6 +51,20 @@ def _get(path: str, params: dict = None) -> dict:
     return resp.json()
 
 
+# Batched endpoints (/sdk/check, /sdk/register-policies, /sdk/log-batch)
+# that returned 404, i.e. a backend older than this SDK. Once an endpoint
+# is known to be missing, calls go straight to the per-item fallback.
+_missing_endpoints: set = set()
+
+
+def _endpoint_missing(name: str, exc: httpx.HTTPStatusError) -> bool:
+    """Record *name* as unavailable if *exc* is a 404; return whether it was."""
+    if exc.response.status_code != 404:
+        return False
+    _missing_endpoints.add(name)
+    return True
+
+
 # -- Schema -------------------------------------------------------------------
 
 def init_db() -> None:
@@ -57,6 +83,21 @@ def get_policy(agent_name: str, action: str) -> Optional[str]:
     return data.get("rule_type")
 
 
+def check_action(agent_name: str, action: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return ``(agent_status, rule_type)`` from a single backend call.
+
+    Falls back to two calls on backends without ``/sdk/check``.
+    """
+    if "check" not in _missing_endpoints:
+        try:
+            data = _get(f"/sdk/check/{agent_name}/{action}")
+            return data.get("status"), data.get("rule_type")
+        except httpx.HTTPStatusError as exc:
+            if not _endpoint_missing("check", exc):
+                raise
+    return get_agent_status(agent_name), get_policy(agent_name, action)
+
+
 def get_all_policies(agent_name: str) -> list:
     data = _get(f"/sdk/policies/{agent_name}")
     return data.get("policies", [])
@@ -64,15 +105,148 @@ def get_all_policies(agent_name: str) -> list:
 
 # -- Writes -------------------------------------------------------------------
 
-def log_event(agent_name: str, action: str, status: str, details: str = "") -> None:
+def log_event(
+    agent_name: str,
+    action: str,
+    status: str,
+    details: str = "",
+    approval_id: Optional[int] = None,
+) -> None:
     _post("/sdk/log", {
         "agent_name": agent_name,
         "action": action,
         "status": status,
         "details": details,
+        "approval_id": approval_id,
     })
 
 
+def log_events(entries: list) -> None:
+    """Write many ``{agent_name, action, status, details}`` entries at once.
+
+    Falls back to one request per entry on backends without ``/sdk/log-batch``.
+    """
+    _write_log_entries(list(entries))
+
+
+def _write_log_entries(pending: list) -> None:
+    """Write *pending*, removing each entry from it once it is stored.
+
+    On failure *pending* holds exactly the entries not yet written, so a
+    retry never writes a duplicate.
+    """
+    if not pending:
+        return
+    if "log-batch" not in _missing_endpoints:
+        try:
+            _post("/sdk/log-batch", {"entries": pending})
+            pending.clear()
+            return
+        except httpx.HTTPStatusError as exc:
+            if not _endpoint_missing("log-batch", exc):
+                raise
+    while pending:
+        log_event(**pending[0])
+        pending.pop(0)
+
+
+# -- Buffered audit writes ----------------------------------------------------
+# Tool-call outcomes are queued and written by a background thread in
+# batches of up to LOG_BATCH_SIZE, at most LOG_BATCH_MS after the first
+# entry of a batch arrives. Ordering is preserved (single writer).
+#
+# The queue holds at most LOG_QUEUE_SIZE entries; when it is full, callers
+# block until the writer catches up rather than dropping entries. A batch
+# the backend rejects is retried LOG_RETRIES times; if it still fails, the
+# entries are written to this module's logger at ERROR level so the gap in
+# the audit trail is recorded.
+
+_log_queue: "queue.Queue[dict]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_log_writer: Optional[threading.Thread] = None
+_log_writer_lock = threading.Lock()
+_flush_registered = False
+
+
+def enqueue_log_event(agent_name: str, action: str, status: str, details: str = "") -> None:
+    """Queue an audit entry for the background writer and return immediately."""
+    global _log_writer, _flush_registered
+    if _log_writer is None or not _log_writer.is_alive():
+        with _log_writer_lock:
+            if _log_writer is None or not _log_writer.is_alive():
+                _log_writer = threading.Thread(
+                    target=_write_log_batches, name="sentinel-log-writer", daemon=True
+                )
+                _log_writer.start()
+                if not _flush_registered:
+                    atexit.register(flush_log_events)
+                    _flush_registered = True
+    _log_queue.put({
+        "agent_name": agent_name,
+        "action": action,
+        "status": status,
+        "details": details,
+    })
+
+
+def flush_log_events(timeout: float = LOG_FLUSH_TIMEOUT) -> bool:
+    """Wait up to *timeout* seconds for every queued audit entry to be sent.
+
+    Returns ``False`` if entries were still pending when the timeout hit.
+    """
+    if _log_writer is None:
+        return True
+    deadline = time.monotonic() + timeout
+    with _log_queue.all_tasks_done:
+        while _log_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(
+                    "Timed out flushing %d audit log entries",
+                    _log_queue.unfinished_tasks,
+                )
+                return False
+            _log_queue.all_tasks_done.wait(remaining)
+    return True
+
+
+def _write_log_batches() -> None:
+    while True:
+        batch = [_log_queue.get()]
+        try:
+            deadline = time.monotonic() + LOG_BATCH_MS / 1000
+            while len(batch) < LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(_log_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            _send_log_batch(batch)
+        except Exception:
+            # Never let the only writer die: later entries would pile up
+            # and every flush would wait out its timeout.
+            logger.exception("Audit log writer failed on %d entries: %r", len(batch), batch)
+        finally:
+            for _ in batch:
+                _log_queue.task_done()
+
+
+def _send_log_batch(batch: list) -> None:
+    # Retries resend only what is still pending: on the per-entry fallback
+    # a failure can land midway, after some entries were already stored.
+    pending = list(batch)
+    for attempt in range(1, LOG_RETRIES + 1):
+        try:
+            _write_log_entries(pending)
+            return
+        except Exception:
+            if attempt == LOG_RETRIES:
+                logger.exception("Dropped %d audit log entries: %r", len(pending), pending)
+                return
+            time.sleep(0.5 * attempt)
+
+
 def update_status(name: str, status: str) -> None:
     _post("/sdk/update-status", {"name": name, "status": status})
 
@@ -89,6 +263,23 @@ def upsert_policy(agent_name: str, action: str, rule_type: str) -> None:
     })
 
 
+def upsert_policies(agent_name: str, rules: dict) -> None:
+    """Upsert ``{action: rule_type}`` for an agent in one request.
+
+    Falls back to one request per rule on backends without
+    ``/sdk/register-policies``.
+    """
+    if "register-policies" not in _missing_endpoints:
+        try:
+            _post("/sdk/register-policies", {"agent_name": agent_name, "policies": rules})
+            return
+        except httpx.HTTPStatusError as exc:
+            if not _endpoint_missing("register-policies", exc):
+                raise
+    for action, rule_type in rules.items():
+        upsert_policy(agent_name, action, rule_type)
+
+
 # -- Approval helpers ---------------------------------------------------------
 
 def create_approval(agent_name: str, action: str, args_json: str = "{}") -> int:
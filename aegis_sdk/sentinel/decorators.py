@@ -149,10 +149,17 @@ def agent(
             for t in tools:
                 # LangChain: has .func attribute (StructuredTool / Tool)
                 if hasattr(t, 'func'):
-                    t = copy.copy(t)
-                    t.func = _langchain_wrapper(t.func)
+                    update = {"func": _langchain_wrapper(t.func)}
                     if hasattr(t, 'handle_tool_error'):
-                        t.handle_tool_error = True
+                        update["handle_tool_error"] = True
+                    if hasattr(t, 'model_copy'):
+                        # Pydantic v2 tools: one shallow copy with the new
+                        # fields, no per-field __setattr__ round.
+                        t = t.model_copy(update=update)
+                    else:
+                        t = copy.copy(t)
+                        for field, value in update.items():
+                            setattr(t, field, value)
                     wrapped.append(t)
 
                 # CrewAI: has ._run method (BaseTool subclass)
@@ -216,11 +223,13 @@ def monitor(agent_name: Optional[str] = None):
 
             func_name = fn.__name__
 
-            # Serialize args for the approval request context
-            try:
-                args_json = json.dumps({"args": str(args), "kwargs": str(kwargs)})
-            except (TypeError, ValueError):
-                args_json = "{}"
+            # Serialize args for the approval request context — only
+            # needed if an approval is created, so deferred until then.
+            def args_json():
+                try:
+                    return json.dumps({"args": str(args), "kwargs": str(kwargs)})
+                except (TypeError, ValueError):
+                    return "{}"
 
             try:
                 allowed = validate_action(resolved_name, func_name, args_json=args_json)
@@ -230,8 +239,8 @@ def monitor(agent_name: Optional[str] = None):
                     allowed = wait_for_approval(resolved_name, func_name, args_json)
 
             except SentinelKillSwitchError as exc:
-                db.log_event(resolved_name, func_name, "KILLED",
-                             f"Agent '{resolved_name}' is PAUSED.")
+                db.enqueue_log_event(resolved_name, func_name, "KILLED",
+                                     f"Agent '{resolved_name}' is PAUSED.")
                 if _monitor_hook:
                     alt = _monitor_hook(resolved_name, func_name, "KILLED")
                     if isinstance(alt, BaseException):
@@ -239,8 +248,8 @@ def monitor(agent_name: Optional[str] = None):
                 raise
 
             except SentinelBlockedError as exc:
-                db.log_event(resolved_name, func_name, "BLOCKED",
-                             f"Action '{func_name}' is blocked by policy.")
+                db.enqueue_log_event(resolved_name, func_name, "BLOCKED",
+                                     f"Action '{func_name}' is blocked by policy.")
                 if _monitor_hook:
                     alt = _monitor_hook(resolved_name, func_name, "BLOCKED")
                     if isinstance(alt, BaseException):
@@ -249,8 +258,8 @@ def monitor(agent_name: Optional[str] = None):
 
             # Action is allowed (directly or via approval) — execute
             result = fn(*args, **kwargs)
-            db.log_event(resolved_name, func_name, "ALLOWED",
-                         f"Action '{func_name}' executed successfully.")
+            db.enqueue_log_event(resolved_name, func_name, "ALLOWED",
+                                 f"Action '{func_name}' executed successfully.")
 
             if _monitor_hook:
                 _monitor_hook(resolved_name, func_name, "ALLOWED")